@@ -4,19 +4,30 @@ import os
 import re
 from datetime import datetime, timedelta
 
+import joblib
 import matplotlib.pyplot as plt
 import numpy as np
 import pandas as pd
-from sklearn.ensemble import IsolationForest
 from sklearn.preprocessing import StandardScaler
 
+from alert_store import AlertStore
+from detectors import get_detector
+
 # Configuration
 LOGS_DIR = "TrainData/"
 CONTAMINATION = 0.05  # % d'anomalies attendues
+DETECTOR = "isolation_forest"  # voir detectors.DETECTORS
 OUTPUT_DIR = "output"
+MODEL_PATH = os.path.join(OUTPUT_DIR, "model.joblib")
+ALERTS_DB = os.path.join(OUTPUT_DIR, "alerts.db")
+RETENTION_DAYS = 365  # durée de conservation des alertes
 
-if not os.path.exists(OUTPUT_DIR):
-    os.makedirs(OUTPUT_DIR)
+# Caractéristiques utilisées pour la détection d'anomalies
+FEATURES = [
+    'hour_of_day', 'day_of_week', 'is_weekend', 'is_night', 
+    'activity_count', 'night_activity_ratio', 'weekend_activity_ratio', 'unique_countries'
+]
+LABEL_COLUMN = 'is_anomaly'  # vérité terrain émise par dataTrain.py
 
 # Fonction pour extraire le pays à partir de l'adresse IP ou de la chaîne de localisation
 def extract_country(row):
@@ -129,231 +140,297 @@ def normalize_logs(logs):
     return normalized
 
 # Charger tous les fichiers JSON du dossier
-all_logs = []
-
-# Parcourir tous les fichiers du répertoire
-for filename in os.listdir(LOGS_DIR):
-    if filename.endswith('.json'):
-        with open(os.path.join(LOGS_DIR, filename), 'r', encoding='utf-8') as file:
-            try:
-                data = json.load(file)
-                if isinstance(data, list):
-                    all_logs.extend(data)
-                else:
-                    all_logs.append(data)
-            except json.JSONDecodeError:
-                print(f"Erreur lors du décodage de {filename}. Fichier ignoré.")
-
-# Normaliser les logs
-normalized_logs = normalize_logs(all_logs)
-
-# Convertir en DataFrame
-df = pd.json_normalize(normalized_logs)
-
-# Assurons-nous que les colonnes essentielles existent
-required_columns = ['user', 'timestamp', 'action', 'deviceType', 'location.countryOrRegion']
-for col in required_columns:
-    if col not in df.columns:
-        df[col] = 'Unknown'
-
-# Nettoyage des données
-df.fillna('Unknown', inplace=True)
-
-# Conversion des timestamps en datetime
-if 'timestamp' in df.columns:
-    df['timestamp'] = pd.to_datetime(df['timestamp'], errors='coerce')
-    # Pour les timestamps non valides, utiliser une date par défaut
-    default_date = pd.to_datetime('2024-01-01')
-    df.loc[df['timestamp'].isna(), 'timestamp'] = pd.to_datetime('2024-01-01', utc=True)  
-      
-    # Créer des caractéristiques temporelles
-    df['hour_of_day'] = df['timestamp'].apply(lambda x: x.hour)
-    df['day_of_week'] = df['timestamp'].apply(lambda x: x.dayofweek)
-    df['is_weekend'] = df['day_of_week'].apply(lambda x: 1 if x >= 5 else 0)
-    df['is_night'] = df['hour_of_day'].apply(lambda x: 1 if (x < 6 or x >= 22) else 0)
-
-# Création de caractéristiques supplémentaires
-df['action_category'] = df['action'].apply(lambda x: x.split('_')[0] if '_' in x else x)
-
-# Regroupement par utilisateur et calcul des statistiques
-user_stats = df.groupby('user').agg({
-    'timestamp': ['count'],
-    'is_night': ['mean'],
-    'is_weekend': ['mean'],
-    'location.countryOrRegion': lambda x: len(set(x))  # Nombre unique de pays
-}).reset_index()
-
-user_stats.columns = ['user', 'activity_count', 'night_activity_ratio', 'weekend_activity_ratio', 'unique_countries']
-
-# Fusion avec le DataFrame principal
-df = pd.merge(df, user_stats, on='user', how='left')
-
-# Préparation des données pour le modèle
-# Sélection des fonctionnalités pertinentes pour la détection d'anomalies
-features = [
-    'hour_of_day', 'day_of_week', 'is_weekend', 'is_night', 
-    'activity_count', 'night_activity_ratio', 'weekend_activity_ratio', 'unique_countries'
-]
+def load_logs(logs_dir=LOGS_DIR):
+    all_logs = []
 
-# S'assurer que toutes les caractéristiques sont numériques
-for feature in features:
-    if feature in df.columns:
-        df[feature] = pd.to_numeric(df[feature], errors='coerce')
-    else:
-        print(f"Avertissement: Caractéristique '{feature}' non trouvée dans les données.")
-        df[feature] = 0
-
-# Remplacer les valeurs NaN par 0
-df[features] = df[features].fillna(0)
-
-# Normalisation des données
-scaler = StandardScaler()
-df_scaled = scaler.fit_transform(df[features])
-
-# Entraînement du modèle de détection d'anomalies
-model = IsolationForest(
-    n_estimators=100,
-    contamination=CONTAMINATION,
-    random_state=42,
-    n_jobs=-1
-)
-
-# Prédiction des anomalies
-df['anomaly_score'] = model.fit_predict(df_scaled)
-df['anomaly'] = df['anomaly_score'].apply(lambda x: 'Anomalie' if x == -1 else 'Normal')
-df['anomaly_probability'] = model.decision_function(df_scaled)
-df['anomaly_probability'] = 1 - (df['anomaly_probability'] - df['anomaly_probability'].min()) / (df['anomaly_probability'].max() - df['anomaly_probability'].min())
-
-# Définition des seuils d'anomalie
-df['anomaly_level'] = pd.cut(
-    df['anomaly_probability'], 
-    bins=[0, 0.2, 0.4, 0.6, 0.8, 1.0], 
-    labels=['Très faible', 'Faible', 'Moyen', 'Élevé', 'Très élevé']
-)
-
-# Identifier les cas très suspects (haut niveau d'anomalie)
-suspicious_cases = df[df['anomaly_probability'] > 0.8].sort_values('anomaly_probability', ascending=False)
-
-print(f"Analyse complète. {len(suspicious_cases)} cas suspects identifiés sur {len(df)} événements.")
-
-# Génération de visualisations
-plt.figure(figsize=(10, 6))
-plt.hist(df['anomaly_probability'], bins=30, color='skyblue', edgecolor='black')
-plt.title("Distribution des probabilités d'anomalie")
-plt.xlabel("Probabilité d'anomalie")
-plt.ylabel("Nombre d'événements")
-plt.savefig(os.path.join(OUTPUT_DIR, "anomaly_distribution.png"))
-plt.close()
-
-# Visualisation par heure de la journée
-plt.figure(figsize=(12, 6))
-normal_by_hour = df[df['anomaly'] == 'Normal'].groupby('hour_of_day').size()
-anomaly_by_hour = df[df['anomaly'] == 'Anomalie'].groupby('hour_of_day').size()
-
-# Assurez-vous que toutes les heures sont présentes
-all_hours = range(24)
-normal_values = [normal_by_hour.get(hour, 0) for hour in all_hours]
-anomaly_values = [anomaly_by_hour.get(hour, 0) for hour in all_hours]
-
-plt.bar(all_hours, normal_values, label='Normal', color='blue', alpha=0.6)
-plt.bar(all_hours, anomaly_values, bottom=normal_values, label='Anomalie', color='red', alpha=0.6)
-plt.title("Répartition des activités normales et anormales par heure de la journée")
-plt.xlabel("Heure de la journée")
-plt.ylabel("Nombre d'événements")
-plt.xticks(all_hours)
-plt.legend()
-plt.savefig(os.path.join(OUTPUT_DIR, "anomaly_by_hour.png"))
-plt.close()
-
-# Cas suspects en tableau
-if not suspicious_cases.empty:
-    plt.figure(figsize=(14, len(suspicious_cases.head(10)) * 0.5 + 2))
-    
-    # top10 des cas dans le tableau
-    top_10_suspicious = suspicious_cases.head(10).reset_index(drop=True)
-    
-    table_data = []
-    for i, row in top_10_suspicious.iterrows():
-        table_data.append([
-            i+1,
-            row['user'],
-            row['action'],
-            row['location.countryOrRegion'],
-            f"{row['anomaly_probability']:.2f}"
-        ])
-
-    # Créer un tableau
-    plt.axis('off')
-    table = plt.table(
-        cellText=table_data,
-        colLabels=['#', 'Utilisateur', 'Action', 'Pays', 'Probabilité'],
-        loc='center',
-        cellLoc='center'
+    # Parcourir tous les fichiers du répertoire
+    for filename in os.listdir(logs_dir):
+        if filename.endswith('.json'):
+            with open(os.path.join(logs_dir, filename), 'r', encoding='utf-8') as file:
+                try:
+                    data = json.load(file)
+                    if isinstance(data, list):
+                        all_logs.extend(data)
+                    else:
+                        all_logs.append(data)
+                except json.JSONDecodeError:
+                    print(f"Erreur lors du décodage de {filename}. Fichier ignoré.")
+
+    return all_logs
+
+# Statistiques de comportement par utilisateur
+def compute_user_stats(df):
+    user_stats = df.groupby('user').agg({
+        'timestamp': ['count'],
+        'is_night': ['mean'],
+        'is_weekend': ['mean'],
+        'location.countryOrRegion': lambda x: len(set(x))  # Nombre unique de pays
+    }).reset_index()
+
+    user_stats.columns = ['user', 'activity_count', 'night_activity_ratio', 'weekend_activity_ratio', 'unique_countries']
+    return user_stats
+
+# Construire le DataFrame des caractéristiques à partir des logs bruts
+# user_stats : statistiques de référence à utiliser pour les utilisateurs déjà connus
+def build_features(logs, user_stats=None):
+    # Normaliser les logs
+    normalized_logs = normalize_logs(logs)
+
+    # Convertir en DataFrame
+    df = pd.json_normalize(normalized_logs)
+
+    # Assurons-nous que les colonnes essentielles existent
+    required_columns = ['user', 'timestamp', 'action', 'deviceType', 'location.countryOrRegion']
+    for col in required_columns:
+        if col not in df.columns:
+            df[col] = 'Unknown'
+
+    # Étiquette de vérité terrain : numérique, absente des logs non simulés (0 par défaut)
+    if LABEL_COLUMN in df.columns:
+        df[LABEL_COLUMN] = pd.to_numeric(df[LABEL_COLUMN], errors='coerce').fillna(0).astype(int)
+
+    # Nettoyage des données
+    df.fillna('Unknown', inplace=True)
+
+    # Conversion des timestamps en datetime
+    if 'timestamp' in df.columns:
+        # Formats hétérogènes selon la source (natif, Microsoft, Google) : chaque valeur est analysée
+        # séparément et ramenée en UTC, les dates sans fuseau étant considérées comme UTC
+        df['timestamp'] = pd.to_datetime(df['timestamp'], errors='coerce', format='mixed', utc=True)
+        # Pour les timestamps non valides, utiliser une date par défaut
+        default_date = pd.to_datetime('2024-01-01')
+        df.loc[df['timestamp'].isna(), 'timestamp'] = pd.to_datetime('2024-01-01', utc=True)  
+
+        # Créer des caractéristiques temporelles
+        df['hour_of_day'] = df['timestamp'].apply(lambda x: x.hour)
+        df['day_of_week'] = df['timestamp'].apply(lambda x: x.dayofweek)
+        df['is_weekend'] = df['day_of_week'].apply(lambda x: 1 if x >= 5 else 0)
+        df['is_night'] = df['hour_of_day'].apply(lambda x: 1 if (x < 6 or x >= 22) else 0)
+
+    # Création de caractéristiques supplémentaires
+    df['action_category'] = df['action'].apply(lambda x: x.split('_')[0] if '_' in x else x)
+
+    # Regroupement par utilisateur et calcul des statistiques
+    batch_stats = compute_user_stats(df)
+
+    # Les statistiques de référence (historique d'entraînement) priment sur celles du lot
+    if user_stats is not None:
+        batch_stats = pd.concat([user_stats, batch_stats[~batch_stats['user'].isin(user_stats['user'])]])
+    user_stats = batch_stats
+
+    # Fusion avec le DataFrame principal
+    df = pd.merge(df, user_stats, on='user', how='left')
+
+    # S'assurer que toutes les caractéristiques sont numériques
+    for feature in FEATURES:
+        if feature in df.columns:
+            df[feature] = pd.to_numeric(df[feature], errors='coerce')
+        else:
+            print(f"Avertissement: Caractéristique '{feature}' non trouvée dans les données.")
+            df[feature] = 0
+
+    # Remplacer les valeurs NaN par 0
+    df[FEATURES] = df[FEATURES].fillna(0)
+
+    return df
+
+# Étiquettes de vérité terrain (1 = anomalie injectée), None si les logs n'en contiennent pas
+def extract_labels(df):
+    if LABEL_COLUMN not in df.columns:
+        return None
+    return df[LABEL_COLUMN].to_numpy()
+
+# Entraîner le scaler et le modèle, et conserver tout ce qu'il faut pour scorer de nouveaux événements
+def train_model(df, detector=DETECTOR, contamination=CONTAMINATION):
+    scaler = StandardScaler()
+    df_scaled = scaler.fit_transform(df[FEATURES])
+
+    model = get_detector(detector, contamination=contamination, random_state=42)
+    model.fit(df_scaled)
+    scores = model.decision_function(df_scaled)
+
+    # Pays habituels : ceux des événements jugés normaux
+    normal_events = df[scores >= 0]
+    usual_countries = normal_events.groupby('user')['location.countryOrRegion'].agg(lambda x: sorted(set(x))).to_dict()
+
+    return {
+        'detector': detector,
+        'features': FEATURES,
+        'scaler': scaler,
+        'model': model,
+        'score_min': float(scores.min()),
+        'score_max': float(scores.max()),
+        'user_stats': compute_user_stats(df),
+        'usual_countries': usual_countries,
+    }
+
+
+if __name__ == "__main__":
+    if not os.path.exists(OUTPUT_DIR):
+        os.makedirs(OUTPUT_DIR)
+
+    df = build_features(load_logs(LOGS_DIR))
+    features = FEATURES
+
+    # Normalisation des données et entraînement du modèle de détection d'anomalies
+    artifact = train_model(df)
+    scaler, model = artifact['scaler'], artifact['model']
+    df_scaled = scaler.transform(df[features])
+
+    # Sauvegarde du modèle pour le service de scoring
+    joblib.dump(artifact, MODEL_PATH)
+
+    # Prédiction des anomalies
+    df['anomaly_score'] = model.predict(df_scaled)
+    df['anomaly'] = df['anomaly_score'].apply(lambda x: 'Anomalie' if x == -1 else 'Normal')
+    df['anomaly_probability'] = model.decision_function(df_scaled)
+    df['anomaly_probability'] = 1 - (df['anomaly_probability'] - df['anomaly_probability'].min()) / (df['anomaly_probability'].max() - df['anomaly_probability'].min())
+
+    # Définition des seuils d'anomalie
+    df['anomaly_level'] = pd.cut(
+        df['anomaly_probability'], 
+        bins=[0, 0.2, 0.4, 0.6, 0.8, 1.0], 
+        labels=['Très faible', 'Faible', 'Moyen', 'Élevé', 'Très élevé']
     )
 
-    table.auto_set_font_size(False)
-    table.set_fontsize(12)
-    table.scale(1.2, 1.5)
+    # Identifier les cas très suspects (haut niveau d'anomalie)
+    suspicious_cases = df[df['anomaly_probability'] > 0.8].sort_values('anomaly_probability', ascending=False)
 
-    for i in range(len(table_data)):
-        prob = float(table_data[i][4])
-        color = (1, 1 - prob, 1 - prob)
-        
-        for j in range(5):
-            table[i+1, j].set_facecolor(color)
-    
-    plt.title("Top 10 des événements suspects", fontsize=16, pad=20)
-    plt.tight_layout()
-    plt.savefig(os.path.join(OUTPUT_DIR, "top_suspicious.png"))
+    print(f"Analyse complète. {len(suspicious_cases)} cas suspects identifiés sur {len(df)} événements.")
+
+    # Génération de visualisations
+    plt.figure(figsize=(10, 6))
+    plt.hist(df['anomaly_probability'], bins=30, color='skyblue', edgecolor='black')
+    plt.title("Distribution des probabilités d'anomalie")
+    plt.xlabel("Probabilité d'anomalie")
+    plt.ylabel("Nombre d'événements")
+    plt.savefig(os.path.join(OUTPUT_DIR, "anomaly_distribution.png"))
     plt.close()
 
-# Exportation des résultats
-df.to_csv(os.path.join(OUTPUT_DIR, "results.csv"), index=False)
-suspicious_cases.to_csv(os.path.join(OUTPUT_DIR, "suspicious_cases.csv"), index=False)
-
-# rapport textuel des cas suspects
-with open(os.path.join(OUTPUT_DIR, "anomaly_report.txt"), "w") as f:
-    f.write("RAPPORT DE DÉTECTION D'ANOMALIES INSTA'TRACE\n")
-    f.write("==========================================\n\n")
-    f.write(f"Date de l'analyse: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-    f.write(f"Nombre total d'événements analysés: {len(df)}\n")
-    f.write(f"Nombre d'anomalies détectées: {len(df[df['anomaly'] == 'Anomalie'])}\n\n")
-    
-    f.write("ALERTES DE HAUTE PRIORITÉ\n")
-    f.write("------------------------\n\n")
-    
+    # Visualisation par heure de la journée
+    plt.figure(figsize=(12, 6))
+    normal_by_hour = df[df['anomaly'] == 'Normal'].groupby('hour_of_day').size()
+    anomaly_by_hour = df[df['anomaly'] == 'Anomalie'].groupby('hour_of_day').size()
+
+    # Assurez-vous que toutes les heures sont présentes
+    all_hours = range(24)
+    normal_values = [normal_by_hour.get(hour, 0) for hour in all_hours]
+    anomaly_values = [anomaly_by_hour.get(hour, 0) for hour in all_hours]
+
+    plt.bar(all_hours, normal_values, label='Normal', color='blue', alpha=0.6)
+    plt.bar(all_hours, anomaly_values, bottom=normal_values, label='Anomalie', color='red', alpha=0.6)
+    plt.title("Répartition des activités normales et anormales par heure de la journée")
+    plt.xlabel("Heure de la journée")
+    plt.ylabel("Nombre d'événements")
+    plt.xticks(all_hours)
+    plt.legend()
+    plt.savefig(os.path.join(OUTPUT_DIR, "anomaly_by_hour.png"))
+    plt.close()
+
+    # Cas suspects en tableau
     if not suspicious_cases.empty:
-        for idx, row in suspicious_cases.iterrows():
-            f.write(f"ALERTE #{idx+1} (Niveau de risque: {row['anomaly_level']})\n")
-            f.write(f"  Utilisateur: {row['user']}\n")
-            f.write(f"  Action: {row['action']}\n")
-            f.write(f"  Timestamp: {row['timestamp']}\n")
-            f.write(f"  Pays: {row['location.countryOrRegion']}\n")
-            f.write(f"  Appareil: {row['deviceType']}\n")
-            f.write(f"  Probabilité d'anomalie: {row['anomaly_probability']:.2f}\n")
-            
-            # recommandations basées sur le type d'alerte
-            if row['is_night'] == 1:
-                f.write("  Raison potentielle: Activité inhabituelle pendant la nuit\n")
-            if row['location.countryOrRegion'] != 'FR' and row['location.countryOrRegion'] != 'Unknown':
-                f.write("  Raison potentielle: Connexion depuis un pays inhabituel\n")
-            
+        plt.figure(figsize=(14, len(suspicious_cases.head(10)) * 0.5 + 2))
+
+        # top10 des cas dans le tableau
+        top_10_suspicious = suspicious_cases.head(10).reset_index(drop=True)
+
+        table_data = []
+        for i, row in top_10_suspicious.iterrows():
+            table_data.append([
+                i+1,
+                row['user'],
+                row['action'],
+                row['location.countryOrRegion'],
+                f"{row['anomaly_probability']:.2f}"
+            ])
+
+        # Créer un tableau
+        plt.axis('off')
+        table = plt.table(
+            cellText=table_data,
+            colLabels=['#', 'Utilisateur', 'Action', 'Pays', 'Probabilité'],
+            loc='center',
+            cellLoc='center'
+        )
+
+        table.auto_set_font_size(False)
+        table.set_fontsize(12)
+        table.scale(1.2, 1.5)
+
+        for i in range(len(table_data)):
+            prob = float(table_data[i][4])
+            color = (1, 1 - prob, 1 - prob)
+
+            for j in range(5):
+                table[i+1, j].set_facecolor(color)
+
+        plt.title("Top 10 des événements suspects", fontsize=16, pad=20)
+        plt.tight_layout()
+        plt.savefig(os.path.join(OUTPUT_DIR, "top_suspicious.png"))
+        plt.close()
+
+    # Exportation des résultats
+    df.to_csv(os.path.join(OUTPUT_DIR, "results.csv"), index=False)
+    suspicious_cases.to_csv(os.path.join(OUTPUT_DIR, "suspicious_cases.csv"), index=False)
+
+    # Historique des alertes : les événements datés dans le futur sont écartés, puis la rétention
+    # est appliquée depuis l'événement le plus récent analysé (les logs pouvant être rejoués),
+    # sans jamais dépasser l'heure actuelle
+    now = pd.Timestamp.now(tz='UTC')
+    future_alerts = suspicious_cases['timestamp'] > now
+    if future_alerts.any():
+        print(f"Avertissement: {future_alerts.sum()} alertes datées dans le futur ignorées pour l'historique.")
+
+    with AlertStore(ALERTS_DB) as store:
+        store.upsert_alerts(suspicious_cases[~future_alerts])
+        past_events = df.loc[df['timestamp'] <= now, 'timestamp']
+        reference = past_events.max() if not past_events.empty else now
+        pruned = store.prune(RETENTION_DAYS, reference=reference)
+        print(f"{store.count_alerts()} alertes dans l'historique ({pruned} supprimées par la rétention).")
+
+    # rapport textuel des cas suspects
+    with open(os.path.join(OUTPUT_DIR, "anomaly_report.txt"), "w") as f:
+        f.write("RAPPORT DE DÉTECTION D'ANOMALIES INSTA'TRACE\n")
+        f.write("==========================================\n\n")
+        f.write(f"Date de l'analyse: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
+        f.write(f"Nombre total d'événements analysés: {len(df)}\n")
+        f.write(f"Nombre d'anomalies détectées: {len(df[df['anomaly'] == 'Anomalie'])}\n\n")
+
+        f.write("ALERTES DE HAUTE PRIORITÉ\n")
+        f.write("------------------------\n\n")
+
+        if not suspicious_cases.empty:
+            for idx, row in suspicious_cases.iterrows():
+                f.write(f"ALERTE #{idx+1} (Niveau de risque: {row['anomaly_level']})\n")
+                f.write(f"  Utilisateur: {row['user']}\n")
+                f.write(f"  Action: {row['action']}\n")
+                f.write(f"  Timestamp: {row['timestamp']}\n")
+                f.write(f"  Pays: {row['location.countryOrRegion']}\n")
+                f.write(f"  Appareil: {row['deviceType']}\n")
+                f.write(f"  Probabilité d'anomalie: {row['anomaly_probability']:.2f}\n")
+
+                # recommandations basées sur le type d'alerte
+                if row['is_night'] == 1:
+                    f.write("  Raison potentielle: Activité inhabituelle pendant la nuit\n")
+                if row['location.countryOrRegion'] != 'FR' and row['location.countryOrRegion'] != 'Unknown':
+                    f.write("  Raison potentielle: Connexion depuis un pays inhabituel\n")
+
+                f.write("\n")
+        else:
+            f.write("Aucune alerte de haute priorité détectée.\n\n")
+
+        # Statistiques par utilisateur
+        f.write("STATISTIQUES PAR UTILISATEUR\n")
+        f.write("--------------------------\n\n")
+
+        for user, data in df.groupby('user'):
+            anomaly_count = len(data[data['anomaly'] == 'Anomalie'])
+            total_count = len(data)
+            f.write(f"Utilisateur: {user}\n")
+            f.write(f"  Nombre total d'activités: {total_count}\n")
+            f.write(f"  Nombre d'anomalies: {anomaly_count} ({anomaly_count/total_count*100:.1f}%)\n")
+            f.write(f"  Pays d'accès: {', '.join(data['location.countryOrRegion'].unique())}\n")
+            f.write(f"  Types d'appareils: {', '.join(data['deviceType'].unique())}\n")
             f.write("\n")
-    else:
-        f.write("Aucune alerte de haute priorité détectée.\n\n")
-    
-    # Statistiques par utilisateur
-    f.write("STATISTIQUES PAR UTILISATEUR\n")
-    f.write("--------------------------\n\n")
-    
-    for user, data in df.groupby('user'):
-        anomaly_count = len(data[data['anomaly'] == 'Anomalie'])
-        total_count = len(data)
-        f.write(f"Utilisateur: {user}\n")
-        f.write(f"  Nombre total d'activités: {total_count}\n")
-        f.write(f"  Nombre d'anomalies: {anomaly_count} ({anomaly_count/total_count*100:.1f}%)\n")
-        f.write(f"  Pays d'accès: {', '.join(data['location.countryOrRegion'].unique())}\n")
-        f.write(f"  Types d'appareils: {', '.join(data['deviceType'].unique())}\n")
-        f.write("\n")
-
-print(f"Rapport généré avec succès dans le dossier: {OUTPUT_DIR}")
\ No newline at end of file
+
+    print(f"Rapport généré avec succès dans le dossier: {OUTPUT_DIR}")
\ No newline at end of file
@@ -0,0 +1,161 @@
+import hashlib
+import sqlite3
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import pandas as pd
+
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+# Les index couvrent les deux tris proposés (ORDERS), avec ou sans filtre utilisateur,
+# pour que chaque page soit lue dans l'ordre de l'index sans trier toutes les alertes
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS alerts (
+    alert_id TEXT PRIMARY KEY,
+    user TEXT NOT NULL,
+    timestamp TEXT NOT NULL,
+    action TEXT,
+    country TEXT,
+    device_type TEXT,
+    ip_address TEXT,
+    is_night INTEGER,
+    anomaly_probability REAL NOT NULL,
+    anomaly_level TEXT,
+    first_seen TEXT NOT NULL,
+    last_seen TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_alerts_probability_timestamp ON alerts (anomaly_probability, timestamp);
+CREATE INDEX IF NOT EXISTS idx_alerts_timestamp_probability ON alerts (timestamp, anomaly_probability);
+CREATE INDEX IF NOT EXISTS idx_alerts_user_probability_timestamp ON alerts (user, anomaly_probability, timestamp);
+CREATE INDEX IF NOT EXISTS idx_alerts_user_timestamp_probability ON alerts (user, timestamp, anomaly_probability);
+"""
+
+# Les colonnes sont renommées comme dans le DataFrame d'InstaTrace.py
+SELECT_COLUMNS = """
+    alert_id, user, timestamp, action,
+    country AS "location.countryOrRegion", device_type AS deviceType, ip_address AS ipAddress,
+    is_night, anomaly_probability, anomaly_level, first_seen, last_seen
+"""
+
+ORDERS = {
+    'anomaly_probability': "anomaly_probability DESC, timestamp DESC",
+    'timestamp': "timestamp DESC, anomaly_probability DESC",
+}
+
+# Convertir une date (str, datetime, Timestamp) au format de stockage, en UTC
+def to_db_timestamp(value):
+    ts = pd.Timestamp(value)
+    if ts.tzinfo is not None:
+        ts = ts.tz_convert('UTC').tz_localize(None)
+    return ts.strftime(TIMESTAMP_FORMAT)
+
+# Identifiant stable d'une alerte, pour la retrouver d'une exécution à l'autre
+def alert_id(user, timestamp, action, ip_address):
+    key = f"{user}|{timestamp}|{action}|{ip_address}"
+    return hashlib.sha1(key.encode('utf-8')).hexdigest()
+
+
+# Historique des alertes dans une base SQLite embarquée
+# read_only : ouverture en lecture seule (interface), sans création du schéma
+class AlertStore:
+    def __init__(self, path, read_only=False):
+        self.path = path
+        if read_only:
+            self.conn = sqlite3.connect(f"{Path(path).resolve().as_uri()}?mode=ro", uri=True)
+        else:
+            self.conn = sqlite3.connect(path)
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.execute("PRAGMA synchronous=NORMAL")
+            self.conn.executescript(SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # Insérer ou mettre à jour les alertes d'un DataFrame en une seule transaction
+    def upsert_alerts(self, alerts):
+        if alerts.empty:
+            return 0
+
+        now = datetime.now(timezone.utc).strftime(TIMESTAMP_FORMAT)
+        timestamps = pd.to_datetime(alerts['timestamp'], utc=True).dt.strftime(TIMESTAMP_FORMAT)
+        ip_addresses = alerts['ipAddress'] if 'ipAddress' in alerts.columns else pd.Series('unknown', index=alerts.index)
+        rows = [
+            (
+                alert_id(user, timestamp, action, ip_address),
+                str(user), timestamp, str(action), str(country), str(device_type), str(ip_address),
+                int(is_night), float(probability), str(level), now, now,
+            )
+            for user, timestamp, action, country, device_type, ip_address, is_night, probability, level in zip(
+                alerts['user'], timestamps, alerts['action'], alerts['location.countryOrRegion'],
+                alerts['deviceType'], ip_addresses, alerts['is_night'],
+                alerts['anomaly_probability'], alerts['anomaly_level'],
+            )
+        ]
+
+        with self.conn:
+            self.conn.executemany("""
+                INSERT INTO alerts (
+                    alert_id, user, timestamp, action, country, device_type, ip_address,
+                    is_night, anomaly_probability, anomaly_level, first_seen, last_seen
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT (alert_id) DO UPDATE SET
+                    anomaly_probability = excluded.anomaly_probability,
+                    anomaly_level = excluded.anomaly_level,
+                    last_seen = excluded.last_seen
+            """, rows)
+        return len(rows)
+
+    # Supprimer les alertes plus anciennes que la durée de rétention
+    # reference : date de fin de la fenêtre de rétention (maintenant, en UTC, par défaut)
+    def prune(self, retention_days, reference=None):
+        reference = pd.Timestamp(reference) if reference is not None else pd.Timestamp.now(tz='UTC')
+        cutoff = to_db_timestamp(reference - timedelta(days=retention_days))
+        with self.conn:
+            cursor = self.conn.execute("DELETE FROM alerts WHERE timestamp < ?", (cutoff,))
+        return cursor.rowcount
+
+    def _where(self, user=None, start=None, end=None, min_probability=None):
+        clauses, params = [], []
+        if user is not None:
+            clauses.append("user = ?")
+            params.append(user)
+        if start is not None:
+            clauses.append("timestamp >= ?")
+            params.append(to_db_timestamp(start))
+        if end is not None:
+            clauses.append("timestamp < ?")
+            params.append(to_db_timestamp(end))
+        if min_probability is not None:
+            clauses.append("anomaly_probability >= ?")
+            params.append(float(min_probability))
+        return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+    # Page d'alertes filtrée par utilisateur, intervalle [start, end[ et probabilité minimale
+    def query_alerts(self, user=None, start=None, end=None, min_probability=None,
+                     order_by='anomaly_probability', limit=20, offset=0):
+        if order_by not in ORDERS:
+            raise ValueError(f"Tri inconnu: {order_by}. Choix possibles: {', '.join(ORDERS)}")
+        where, params = self._where(user, start, end, min_probability)
+        query = f"SELECT {SELECT_COLUMNS} FROM alerts{where} ORDER BY {ORDERS[order_by]} LIMIT ? OFFSET ?"
+        alerts = pd.read_sql_query(query, self.conn, params=params + [int(limit), int(offset)])
+        alerts['timestamp'] = pd.to_datetime(alerts['timestamp'])
+        return alerts
+
+    def count_alerts(self, user=None, start=None, end=None, min_probability=None):
+        where, params = self._where(user, start, end, min_probability)
+        return self.conn.execute(f"SELECT COUNT(*) FROM alerts{where}", params).fetchone()[0]
+
+    def list_users(self):
+        return [row[0] for row in self.conn.execute("SELECT DISTINCT user FROM alerts ORDER BY user")]
+
+    def time_range(self):
+        first, last = self.conn.execute("SELECT MIN(timestamp), MAX(timestamp) FROM alerts").fetchone()
+        if first is None:
+            return None, None
+        return pd.Timestamp(first), pd.Timestamp(last)
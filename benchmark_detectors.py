@@ -0,0 +1,109 @@
+import argparse
+import os
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+from sklearn.preprocessing import StandardScaler
+
+from detectors import DETECTORS, get_detector
+from InstaTrace import CONTAMINATION, FEATURES, LOGS_DIR, OUTPUT_DIR, build_features, extract_labels, load_logs
+
+REFERENCE = "isolation_forest"
+
+# Rééchantillonner la matrice (et les étiquettes) pour simuler un volume d'événements donné
+def resample(X, labels, n_events, random_state=42):
+    rng = np.random.default_rng(random_state)
+    rows = rng.integers(0, X.shape[0], size=n_events)
+    # Léger bruit pour éviter des doublons exacts
+    X = X[rows] + rng.normal(0, 0.01, size=(n_events, X.shape[1]))
+    return X, labels[rows] if labels is not None else None
+
+# Mesurer le temps d'entraînement, le débit de scoring et le pic mémoire d'un détecteur
+def benchmark(name, X, repeat=3):
+    # Passe de chronométrage, sans tracemalloc qui ralentit fortement certains détecteurs
+    model = get_detector(name, contamination=CONTAMINATION, random_state=42)
+    start = time.perf_counter()
+    model.fit(X)
+    fit_time = time.perf_counter() - start
+
+    score_times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        scores = model.decision_function(X)
+        score_times.append(time.perf_counter() - start)
+
+    # Passe séparée pour la mémoire : le pic ne couvre que les allocations suivies
+    # par tracemalloc (Python et NumPy)
+    tracemalloc.start()
+    get_detector(name, contamination=CONTAMINATION, random_state=42).fit(X).decision_function(X)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    score_time = min(score_times)
+    return {
+        'detector': name,
+        'fit_time_s': fit_time,
+        'score_time_s': score_time,
+        'events_per_s': X.shape[0] / score_time if score_time > 0 else float('inf'),
+        'peak_memory_mb': peak / 1024 ** 2,
+    }, scores
+
+# Qualité de détection : accord avec les anomalies signalées par le détecteur de référence
+def agreement(scores, reference_scores):
+    flagged = scores < 0
+    reference = reference_scores < 0
+    true_positives = np.sum(flagged & reference)
+    return {
+        'flagged': int(flagged.sum()),
+        'precision_vs_ref': true_positives / flagged.sum() if flagged.any() else 0.0,
+        'recall_vs_ref': true_positives / reference.sum() if reference.any() else 0.0,
+        'spearman_vs_ref': pd.Series(scores).corr(pd.Series(reference_scores), method='spearman'),
+    }
+
+# Qualité de détection par rapport à la vérité terrain (anomalies injectées par dataTrain.py)
+def label_quality(flagged, labels):
+    labels = labels.astype(bool)
+    true_positives = np.sum(flagged & labels)
+    precision = true_positives / flagged.sum() if flagged.any() else 0.0
+    recall = true_positives / labels.sum() if labels.any() else 0.0
+    f1 = 2 * precision * recall / (precision + recall) if precision + recall > 0 else 0.0
+    return {'precision': precision, 'recall': recall, 'f1': f1}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Comparaison des détecteurs d'anomalies InstaTrace")
+    parser.add_argument('--events', type=int, default=None,
+                        help="Nombre d'événements simulés (rééchantillonnage de la matrice)")
+    parser.add_argument('--repeat', type=int, default=3, help="Nombre de répétitions du scoring")
+    parser.add_argument('--detectors', nargs='+', default=list(DETECTORS), choices=list(DETECTORS))
+    args = parser.parse_args()
+
+    df = build_features(load_logs(LOGS_DIR))
+    X = StandardScaler().fit_transform(df[FEATURES])
+    labels = extract_labels(df)
+    if args.events:
+        X, labels = resample(X, labels, args.events)
+
+    print(f"Matrice de caractéristiques: {X.shape[0]} événements x {X.shape[1]} caractéristiques")
+
+    names = [REFERENCE] + [name for name in args.detectors if name != REFERENCE]
+    rows = []
+    reference_scores = None
+    for name in names:
+        row, scores = benchmark(name, X, repeat=args.repeat)
+        if reference_scores is None:
+            reference_scores = scores
+        row.update(agreement(scores, reference_scores))
+        if labels is not None:
+            row.update(label_quality(scores < 0, labels))
+        rows.append(row)
+        print(f"{name}: entraînement {row['fit_time_s']:.3f}s, {row['events_per_s']:.0f} événements/s")
+
+    results = pd.DataFrame(rows)
+    print(results.to_string(index=False, float_format=lambda x: f"{x:.4f}"))
+
+    if not os.path.exists(OUTPUT_DIR):
+        os.makedirs(OUTPUT_DIR)
+    results.to_csv(os.path.join(OUTPUT_DIR, "detector_benchmark.csv"), index=False)
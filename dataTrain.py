@@ -57,7 +57,8 @@ def generate_normal_activities(user, num_activities=50):
             "deviceType": random.choice(["PC", "MOBILE"]),
             "location": {
                 "countryOrRegion": country,
-            }
+            },
+            "is_anomaly": 0  # vérité terrain : activité normale
         }
         activities.append(activity)
     
@@ -97,7 +98,8 @@ def generate_abnormal_activities(user, num_activities=5):
             "deviceType": random.choice(["PC", "MOBILE"]),
             "location": {
                 "countryOrRegion": country,
-            }
+            },
+            "is_anomaly": 1  # vérité terrain : activité anormale injectée
         }
         activities.append(activity)
     
@@ -0,0 +1,184 @@
+import numpy as np
+from sklearn.ensemble import IsolationForest
+
+# Interface commune des détecteurs (même conventions que scikit-learn) :
+# - fit(X) : apprentissage sur la matrice de caractéristiques normalisée
+# - score_samples(X) : score de normalité, plus il est bas plus l'événement est anormal
+# - decision_function(X) : score_samples(X) - offset_, négatif pour une anomalie
+# - predict(X) / fit_predict(X) : -1 pour une anomalie, 1 pour un événement normal
+class BaseDetector:
+    def __init__(self, contamination=0.05, random_state=None):
+        self.contamination = contamination
+        self.random_state = random_state
+
+    def _fit(self, X):
+        raise NotImplementedError
+
+    def score_samples(self, X):
+        raise NotImplementedError
+
+    def fit(self, X):
+        X = np.asarray(X, dtype=np.float64)
+        self._fit(X)
+        self.offset_ = self._threshold(self.score_samples(X))
+        return self
+
+    # Seuil choisi pour que la proportion d'anomalies sur l'entraînement soit `contamination`.
+    # En cas d'ex æquo autour du k-ième score, le groupe entier est signalé, sauf s'il
+    # dépasse le double du nombre visé : il est alors exclu, quitte à ne rien signaler
+    # (scores tous égaux), comme le seuil par percentile de scikit-learn
+    def _threshold(self, scores):
+        scores = np.sort(scores)
+        n_flagged = min(len(scores), max(1, int(np.ceil(self.contamination * len(scores)))))
+        kth = scores[n_flagged - 1]
+        n_with_ties = np.searchsorted(scores, kth, side='right')
+
+        if n_with_ties > 2 * n_flagged:
+            # predict signale les scores strictement inférieurs au seuil
+            return kth
+        if n_with_ties < len(scores):
+            return (kth + scores[n_with_ties]) / 2
+        return np.nextafter(kth, np.inf)
+
+    def decision_function(self, X):
+        return self.score_samples(X) - self.offset_
+
+    def predict(self, X):
+        return np.where(self.decision_function(X) < 0, -1, 1)
+
+    def fit_predict(self, X):
+        return self.fit(X).predict(X)
+
+
+# Histogram-Based Outlier Score : un histogramme par caractéristique,
+# le score est la somme des log-densités (hypothèse d'indépendance)
+class HBOSDetector(BaseDetector):
+    def __init__(self, n_bins=10, alpha=0.1, contamination=0.05, random_state=None):
+        super().__init__(contamination=contamination, random_state=random_state)
+        self.n_bins = n_bins
+        self.alpha = alpha
+
+    def _fit(self, X):
+        n_features = X.shape[1]
+        self.edges_ = np.empty((n_features, self.n_bins + 1))
+        self.log_density_ = np.empty((n_features, self.n_bins))
+
+        for j in range(n_features):
+            counts, edges = np.histogram(X[:, j], bins=self.n_bins)
+            # Hauteurs normalisées à 1 puis lissées pour éviter log(0)
+            density = counts / counts.max() + self.alpha
+            self.edges_[j] = edges
+            self.log_density_[j] = np.log(density)
+
+    def score_samples(self, X):
+        X = np.asarray(X, dtype=np.float64)
+        scores = np.zeros(X.shape[0])
+
+        for j in range(X.shape[1]):
+            # Les valeurs hors de l'intervalle d'entraînement tombent dans un bac vide
+            bins = np.searchsorted(self.edges_[j], X[:, j], side='right') - 1
+            outside = (X[:, j] < self.edges_[j][0]) | (X[:, j] > self.edges_[j][-1])
+            bins = np.clip(bins, 0, self.n_bins - 1)
+            log_density = self.log_density_[j][bins]
+            log_density[outside] = np.log(self.alpha)
+            scores += log_density
+
+        return scores
+
+
+# Z-scores robustes par caractéristique (médiane et MAD),
+# le score est la moyenne des écarts (aggregate="mean") ou l'écart maximal (aggregate="max") ;
+# la moyenne reste continue même avec des caractéristiques binaires
+class RobustZScoreDetector(BaseDetector):
+    def __init__(self, aggregate="mean", contamination=0.05, random_state=None):
+        super().__init__(contamination=contamination, random_state=random_state)
+        self.aggregate = aggregate
+
+    def _fit(self, X):
+        self.median_ = np.median(X, axis=0)
+        mad = 1.4826 * np.median(np.abs(X - self.median_), axis=0)
+        # Caractéristiques binaires ou quasi constantes : MAD nulle, on se rabat sur l'écart-type
+        std = X.std(axis=0)
+        scale = np.where(mad > 0, mad, std)
+        self.scale_ = np.where(scale > 0, scale, 1.0)
+
+    def score_samples(self, X):
+        X = np.asarray(X, dtype=np.float64)
+        z = np.abs(X - self.median_) / self.scale_
+        if self.aggregate == "mean":
+            return -z.mean(axis=1)
+        return -z.max(axis=1)
+
+
+# Local Outlier Factor approché : les voisins sont cherchés uniquement
+# dans un sous-échantillon de référence de taille max_samples,
+# et les distances sont calculées par blocs pour borner la mémoire
+class SubsampledLOFDetector(BaseDetector):
+    def __init__(self, n_neighbors=20, max_samples=2048, chunk_size=1024,
+                 contamination=0.05, random_state=None):
+        super().__init__(contamination=contamination, random_state=random_state)
+        self.n_neighbors = n_neighbors
+        self.max_samples = max_samples
+        self.chunk_size = chunk_size
+
+    def _kneighbors(self, X, exclude_self=False):
+        k = self.k_
+        distances = np.empty((X.shape[0], k))
+        indices = np.empty((X.shape[0], k), dtype=np.intp)
+        ref_sq = np.einsum('ij,ij->i', self.reference_, self.reference_)
+
+        for start in range(0, X.shape[0], self.chunk_size):
+            chunk = X[start:start + self.chunk_size]
+            chunk_sq = np.einsum('ij,ij->i', chunk, chunk)
+            d2 = chunk_sq[:, None] + ref_sq[None, :] - 2.0 * chunk @ self.reference_.T
+            np.maximum(d2, 0, out=d2)
+            if exclude_self:
+                # Le point de référence ne doit pas être son propre voisin
+                rows = np.arange(chunk.shape[0])
+                d2[rows, start + rows] = np.inf
+            idx = np.argpartition(d2, k - 1, axis=1)[:, :k]
+            indices[start:start + len(chunk)] = idx
+            distances[start:start + len(chunk)] = np.sqrt(np.take_along_axis(d2, idx, axis=1))
+
+        return distances, indices
+
+    def _local_reachability_density(self, distances, indices):
+        reach = np.maximum(distances, self.k_distance_[indices])
+        return 1.0 / (reach.mean(axis=1) + 1e-10)
+
+    def _fit(self, X):
+        rng = np.random.default_rng(self.random_state)
+        n_samples = min(self.max_samples, X.shape[0])
+        sample = rng.choice(X.shape[0], size=n_samples, replace=False)
+        self.reference_ = X[sample]
+        self.k_ = max(1, min(self.n_neighbors, n_samples - 1))
+
+        distances, indices = self._kneighbors(self.reference_, exclude_self=True)
+        self.k_distance_ = distances.max(axis=1)
+        self.reference_lrd_ = self._local_reachability_density(distances, indices)
+
+    def score_samples(self, X):
+        X = np.asarray(X, dtype=np.float64)
+        distances, indices = self._kneighbors(X)
+        lrd = self._local_reachability_density(distances, indices)
+        lof = self.reference_lrd_[indices].mean(axis=1) / lrd
+        return -lof
+
+
+# Backends disponibles et paramètres par défaut
+DETECTORS = {
+    "isolation_forest": IsolationForest,
+    "hbos": HBOSDetector,
+    "robust_zscore": RobustZScoreDetector,
+    "lof_subsampled": SubsampledLOFDetector,
+}
+
+DEFAULT_PARAMS = {
+    "isolation_forest": {"n_estimators": 100, "n_jobs": -1},
+}
+
+# Instancier un détecteur à partir de son nom
+def get_detector(name, **params):
+    if name not in DETECTORS:
+        raise ValueError(f"Détecteur inconnu: {name}. Choix possibles: {', '.join(DETECTORS)}")
+    return DETECTORS[name](**{**DEFAULT_PARAMS.get(name, {}), **params})
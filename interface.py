@@ -1,6 +1,6 @@
 import json
 import os
-from datetime import datetime
+from datetime import datetime, timedelta
 
 import matplotlib.pyplot as plt
 import pandas as pd
@@ -9,6 +9,12 @@ import plotly.graph_objects as go
 import seaborn as sns
 import streamlit as st
 
+from alert_store import AlertStore
+
+ALERTS_DB = "output/alerts.db"
+ALERT_THRESHOLD = 0.8  # seuil des alertes de haute priorité (voir InstaTrace.py)
+ALERT_ORDERS = {'anomaly_probability': "Plus suspectes d'abord", 'timestamp': "Plus récentes d'abord"}
+
 # Configuration de la page
 st.set_page_config(
     page_title="InstaTrace - POC",
@@ -33,22 +39,18 @@ users = [
 # Charger les données
 @st.cache_data
 def load_data():
-    if os.path.exists("output/results.csv") and os.path.exists("output/suspicious_cases.csv"):
+    if os.path.exists("output/results.csv"):
         results = pd.read_csv("output/results.csv")
-        suspicious = pd.read_csv("output/suspicious_cases.csv")
-        
 
         if 'timestamp' in results.columns:
             results['timestamp'] = pd.to_datetime(results['timestamp'])
-        if 'timestamp' in suspicious.columns:
-            suspicious['timestamp'] = pd.to_datetime(suspicious['timestamp'])
         
-        return results, suspicious
+        return results
     else:
         st.error("Les fichiers de données n'ont pas été trouvés. Veuillez exécuter le script d'analyse au préalable.")
-        return pd.DataFrame(), pd.DataFrame()
+        return pd.DataFrame()
 
-results_df, suspicious_df = load_data()
+results_df = load_data()
 
 if not results_df.empty:
     # Afficher les statistiques générales
@@ -141,9 +143,46 @@ if not results_df.empty:
     # Alertes de haute priorité
     st.header("Alertes de haute priorité")
     
-    if not suspicious_df.empty:
-        for idx, row in suspicious_df.head(5).iterrows():
-            with st.expander(f"Alerte #{idx+1}: {row['user']} - {row['action']} ({row['timestamp']})"):
+    if not os.path.exists(ALERTS_DB):
+        st.info("Aucun historique d'alertes. Veuillez exécuter le script d'analyse au préalable.")
+    else:
+        with AlertStore(ALERTS_DB, read_only=True) as store:
+            first_alert, last_alert = store.time_range()
+            
+            # Filtres appliqués directement dans la base (requêtes indexées et paginées)
+            col1, col2, col3, col4, col5 = st.columns(5)
+            with col1:
+                alert_user = st.selectbox("Utilisateur", ["Tous"] + store.list_users())
+            with col2:
+                period = ()
+                if first_alert is not None and st.checkbox("Filtrer par période"):
+                    period = st.date_input("Période", (first_alert.date(), last_alert.date()))
+            with col3:
+                min_probability = st.slider("Probabilité minimale", ALERT_THRESHOLD, 1.0, ALERT_THRESHOLD, 0.01)
+            with col4:
+                order_by = st.selectbox("Trier par", list(ALERT_ORDERS), format_func=ALERT_ORDERS.get)
+            with col5:
+                page_size = st.selectbox("Alertes par page", [5, 10, 20, 50])
+            
+            filters = {'user': None if alert_user == "Tous" else alert_user}
+            # Toutes les alertes stockées dépassent déjà le seuil : le filtre n'est utile qu'au-delà
+            if min_probability > ALERT_THRESHOLD:
+                filters['min_probability'] = min_probability
+            if len(period) == 2:
+                filters['start'] = period[0]
+                filters['end'] = period[1] + timedelta(days=1)
+            
+            alert_count = store.count_alerts(**filters)
+            page_count = max(1, -(-alert_count // page_size))
+            page = st.number_input(f"Page (sur {page_count})", min_value=1, max_value=page_count, value=1)
+            offset = (page - 1) * page_size
+            
+            alerts_page = store.query_alerts(**filters, order_by=order_by, limit=page_size, offset=offset)
+        
+        st.caption(f"{alert_count} alertes correspondant aux filtres")
+        
+        for idx, row in alerts_page.iterrows():
+            with st.expander(f"Alerte #{offset+idx+1}: {row['user']} - {row['action']} ({row['timestamp']})"):
                 col1, col2 = st.columns([1, 2])
                 
                 with col1:
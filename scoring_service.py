@@ -0,0 +1,340 @@
+import argparse
+import asyncio
+import json
+import os
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from InstaTrace import LOGS_DIR, MODEL_PATH, build_features, load_logs, normalize_logs, train_model
+
+# Configuration
+HOST = "127.0.0.1"
+PORT = 8080
+MAX_BATCH_SIZE = 1024  # nombre maximal d'événements par micro-lot
+MAX_DELAY_MS = 10  # attente maximale pour compléter un micro-lot
+MAX_BODY_SIZE = 16 * 1024 * 1024
+PREPARE_WORKERS = 4  # threads de préparation des requêtes
+SENSITIVE_ACTIONS = ['download_all_files', 'change_permissions', 'reset_password', 'Modify permissions']
+
+# Charger le modèle préentraîné, ou l'entraîner sur les données disponibles
+def load_artifact(model_path=MODEL_PATH, logs_dir=LOGS_DIR):
+    if os.path.exists(model_path):
+        return joblib.load(model_path)
+    print(f"Modèle {model_path} introuvable, entraînement sur {logs_dir}.")
+    return train_model(build_features(load_logs(logs_dir)))
+
+# Codes de raison associés à un événement
+def reason_codes(row, usual_countries, is_anomaly):
+    reasons = []
+
+    if row['is_night'] == 1:
+        reasons.append('NIGHT_ACTIVITY')
+    if row['is_weekend'] == 1:
+        reasons.append('WEEKEND_ACTIVITY')
+
+    country = row['location.countryOrRegion']
+    known = usual_countries.get(row['user'])
+    if country != 'Unknown' and known is not None and country not in known:
+        reasons.append('UNUSUAL_COUNTRY')
+    if known is None:
+        reasons.append('UNKNOWN_USER')
+
+    if row['action'] in SENSITIVE_ACTIONS:
+        reasons.append('SENSITIVE_ACTION')
+
+    if is_anomaly and not reasons:
+        reasons.append('UNUSUAL_COMBINATION')
+
+    return reasons
+
+
+# Erreur propre aux événements d'une requête (renvoyée en 400 à cette seule requête)
+class InvalidEventsError(ValueError):
+    pass
+
+# Décoder le corps d'une requête /score : liste d'événements ou {"events": [...]}
+def parse_body(body):
+    try:
+        payload = json.loads(body or b'null')
+    except (json.JSONDecodeError, UnicodeDecodeError) as exc:
+        raise InvalidEventsError(f"JSON invalide: {exc}") from exc
+
+    logs = payload.get('events') if isinstance(payload, dict) else payload
+    if not isinstance(logs, list) or not all(isinstance(log, dict) for log in logs):
+        raise InvalidEventsError("Le corps doit être une liste d'événements (objets JSON) ou {\"events\": [...]}")
+    return logs
+
+# Réponse HTTP complète (en-têtes et corps JSON)
+def encode_response(status, response, keep_alive):
+    data = json.dumps(response).encode('utf-8')
+    return (
+        f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+        f"Content-Type: application/json\r\n"
+        f"Content-Length: {len(data)}\r\n"
+        f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode('latin-1') + data
+    )
+
+
+# Compteurs de latence et de débit du service
+class ServiceMetrics:
+    def __init__(self, window=1000):
+        self.started_at = time.monotonic()
+        self.requests = 0
+        self.errors = 0
+        self.events = 0
+        self.batches = 0
+        self.batch_events = 0
+        self.scoring_time = 0.0
+        self.latencies = deque(maxlen=window)
+
+    def record_request(self, n_events, latency):
+        self.requests += 1
+        self.events += n_events
+        self.latencies.append(latency)
+
+    def record_batch(self, n_events, duration):
+        self.batches += 1
+        self.batch_events += n_events
+        self.scoring_time += duration
+
+    def snapshot(self):
+        uptime = time.monotonic() - self.started_at
+        latencies = np.array(self.latencies) * 1000 if self.latencies else np.zeros(1)
+        return {
+            'uptime_s': uptime,
+            'requests_total': self.requests,
+            'errors_total': self.errors,
+            'events_total': self.events,
+            'batches_total': self.batches,
+            'mean_batch_size': self.batch_events / self.batches if self.batches else 0.0,
+            'events_per_s': self.events / uptime if uptime > 0 else 0.0,
+            'scoring_events_per_s': self.batch_events / self.scoring_time if self.scoring_time > 0 else 0.0,
+            'latency_ms_p50': float(np.percentile(latencies, 50)),
+            'latency_ms_p95': float(np.percentile(latencies, 95)),
+            'latency_ms_p99': float(np.percentile(latencies, 99)),
+        }
+
+
+# Service de scoring : les requêtes concurrentes sont regroupées en micro-lots
+# pour n'appeler le scaler et le modèle qu'une fois par lot
+class ScoringService:
+    def __init__(self, artifact, max_batch_size=MAX_BATCH_SIZE, max_delay_ms=MAX_DELAY_MS):
+        self.artifact = artifact
+        self.max_batch_size = max_batch_size
+        self.max_delay = max_delay_ms / 1000
+        self.metrics = ServiceMetrics()
+        self._queue = None
+        self._batcher = None
+        # Décodage, normalisation et calcul des caractéristiques de chaque requête,
+        # hors de la boucle asyncio (corps jusqu'à MAX_BODY_SIZE)
+        self._executor = ThreadPoolExecutor(max_workers=PREPARE_WORKERS)
+        # Un seul thread pour le scaler et le modèle, appelés une fois par micro-lot
+        self._scoring_executor = ThreadPoolExecutor(max_workers=1)
+
+    async def start(self):
+        self._queue = asyncio.Queue()
+        self._batcher = asyncio.create_task(self._batch_loop())
+
+    async def stop(self):
+        if self._batcher is not None:
+            self._batcher.cancel()
+            try:
+                await self._batcher
+            except asyncio.CancelledError:
+                pass
+        self._executor.shutdown(wait=False)
+        self._scoring_executor.shutdown(wait=False)
+
+    # Scorer une liste de logs bruts (format natif, Microsoft ou Google).
+    # Les caractéristiques sont calculées pour chaque requête séparément : seules les
+    # matrices de caractéristiques sont regroupées, le score d'un événement ne dépend
+    # donc pas des autres requêtes du même micro-lot
+    async def score(self, logs):
+        loop = asyncio.get_running_loop()
+        try:
+            df, X = await loop.run_in_executor(self._executor, self._prepare, logs)
+        except Exception as exc:
+            raise InvalidEventsError(f"Événements invalides: {exc}") from exc
+        if df is None:
+            return []
+
+        future = loop.create_future()
+        await self._queue.put((X, future))
+        scores = await future
+        return await loop.run_in_executor(self._executor, self._format_results, df, scores)
+
+    def _prepare(self, logs):
+        events = normalize_logs(logs)
+        if not events:
+            return None, None
+        df = build_features(events, user_stats=self.artifact['user_stats'])
+        return df, df[self.artifact['features']].to_numpy(dtype=np.float64)
+
+    async def _batch_loop(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            pending = [await self._queue.get()]
+            size = pending[0][0].shape[0]
+            deadline = loop.time() + self.max_delay
+
+            # Compléter le lot jusqu'à la taille maximale ou l'expiration du délai
+            while size < self.max_batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self._queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                pending.append(item)
+                size += item[0].shape[0]
+
+            X = np.vstack([matrix for matrix, _ in pending])
+            try:
+                scores = await loop.run_in_executor(self._scoring_executor, self._score_batch, X)
+            except Exception as exc:
+                for _, future in pending:
+                    if not future.done():
+                        future.set_exception(exc)
+                continue
+
+            # Redistribuer les scores à chaque requête
+            offset = 0
+            for matrix, future in pending:
+                if not future.done():
+                    future.set_result(scores[offset:offset + matrix.shape[0]])
+                offset += matrix.shape[0]
+
+    def _score_batch(self, X):
+        start = time.perf_counter()
+        # Le scaler a été ajusté sur un DataFrame : mêmes noms de colonnes pour tout le lot
+        features = pd.DataFrame(X, columns=self.artifact['features'])
+        scores = self.artifact['model'].decision_function(self.artifact['scaler'].transform(features))
+        self.metrics.record_batch(X.shape[0], time.perf_counter() - start)
+        return scores
+
+    def _format_results(self, df, scores):
+        artifact = self.artifact
+        score_range = artifact['score_max'] - artifact['score_min']
+        if score_range <= 0:
+            score_range = 1.0
+        probabilities = np.clip(1 - (scores - artifact['score_min']) / score_range, 0, 1)
+
+        results = []
+        for row, score, probability in zip(df.to_dict('records'), scores, probabilities):
+            is_anomaly = bool(score < 0)
+            results.append({
+                'user': row['user'],
+                'timestamp': row['timestamp'].isoformat(),
+                'action': row['action'],
+                'anomaly_score': float(score),
+                'anomaly_probability': float(probability),
+                'anomaly': 'Anomalie' if is_anomaly else 'Normal',
+                'reasons': reason_codes(row, artifact['usual_countries'], is_anomaly),
+            })
+        return results
+
+    # Traitement d'une requête HTTP déjà découpée
+    async def handle_request(self, method, path, body):
+        if method == 'GET' and path == '/health':
+            return HTTPStatus.OK, {'status': 'ok', 'detector': self.artifact.get('detector')}
+        if method == 'GET' and path == '/metrics':
+            return HTTPStatus.OK, self.metrics.snapshot()
+        if path != '/score':
+            return HTTPStatus.NOT_FOUND, {'error': f"Chemin inconnu: {path}"}
+        if method != 'POST':
+            return HTTPStatus.METHOD_NOT_ALLOWED, {'error': "Utiliser POST pour /score"}
+
+        start = time.perf_counter()
+        try:
+            logs = await asyncio.get_running_loop().run_in_executor(self._executor, parse_body, body)
+        except InvalidEventsError as exc:
+            self.metrics.errors += 1
+            return HTTPStatus.BAD_REQUEST, {'error': str(exc)}
+
+        try:
+            results = await self.score(logs)
+        except InvalidEventsError as exc:
+            self.metrics.errors += 1
+            return HTTPStatus.BAD_REQUEST, {'error': str(exc)}
+        except Exception as exc:
+            self.metrics.errors += 1
+            return HTTPStatus.INTERNAL_SERVER_ERROR, {'error': str(exc)}
+
+        self.metrics.record_request(len(results), time.perf_counter() - start)
+        return HTTPStatus.OK, {'count': len(results), 'results': results}
+
+    # Serveur HTTP/1.1 minimal (keep-alive, corps avec Content-Length)
+    async def handle_connection(self, reader, writer):
+        loop = asyncio.get_running_loop()
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line.strip():
+                    break
+
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+
+                parts = request_line.decode('latin-1').split()
+                length = headers.get('content-length', '0')
+                # Requête mal formée : réponse d'erreur puis fermeture de la connexion
+                error = None
+                if len(parts) != 3 or not parts[2].startswith('HTTP/'):
+                    error = HTTPStatus.BAD_REQUEST, {'error': "Ligne de requête invalide"}
+                elif not length.isdigit():
+                    error = HTTPStatus.BAD_REQUEST, {'error': "Content-Length invalide"}
+                elif int(length) > MAX_BODY_SIZE:
+                    error = HTTPStatus.REQUEST_ENTITY_TOO_LARGE, {'error': "Corps trop volumineux"}
+
+                if error is not None:
+                    self.metrics.errors += 1
+                    status, response = error
+                    keep_alive = False
+                else:
+                    method, path = parts[0], parts[1].split('?', 1)[0]
+                    body = await reader.readexactly(int(length)) if int(length) else b''
+                    status, response = await self.handle_request(method, path, body)
+                    keep_alive = headers.get('connection', '').lower() != 'close'
+
+                data = await loop.run_in_executor(self._executor, encode_response, status, response, keep_alive)
+                writer.write(data)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionResetError):
+            pass
+        finally:
+            writer.close()
+
+
+async def serve(service, host=HOST, port=PORT):
+    await service.start()
+    server = await asyncio.start_server(service.handle_connection, host, port)
+    print(f"Service de scoring InstaTrace en écoute sur http://{host}:{port}")
+    async with server:
+        await server.serve_forever()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Service HTTP de scoring InstaTrace")
+    parser.add_argument('--host', default=HOST)
+    parser.add_argument('--port', type=int, default=PORT)
+    parser.add_argument('--model', default=MODEL_PATH, help="Modèle sauvegardé par InstaTrace.py")
+    parser.add_argument('--max-batch-size', type=int, default=MAX_BATCH_SIZE)
+    parser.add_argument('--max-delay-ms', type=float, default=MAX_DELAY_MS)
+    args = parser.parse_args()
+
+    service = ScoringService(load_artifact(args.model), args.max_batch_size, args.max_delay_ms)
+    asyncio.run(serve(service, args.host, args.port))
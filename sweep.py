@@ -0,0 +1,162 @@
+import argparse
+import hashlib
+import itertools
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import IsolationForest
+from sklearn.preprocessing import StandardScaler
+
+from benchmark_detectors import label_quality
+from InstaTrace import FEATURES, LOGS_DIR, OUTPUT_DIR, build_features, extract_labels, load_logs
+
+# Configuration de la grille
+CONTAMINATIONS = [0.01, 0.03, 0.05, 0.1]
+N_ESTIMATORS = [25, 50, 100, 200]
+MAX_SAMPLES = ['auto', 64, 256]
+FEATURE_SUBSETS = {
+    'all': FEATURES,
+    'temporal': ['hour_of_day', 'day_of_week', 'is_weekend', 'is_night'],
+    'user_stats': ['activity_count', 'night_activity_ratio', 'weekend_activity_ratio', 'unique_countries'],
+    'night_and_countries': ['hour_of_day', 'is_night', 'night_activity_ratio', 'unique_countries'],
+}
+TARGET_RECALL = 0.9  # rappel minimal sur les anomalies injectées
+MIN_PRECISION = 0.8  # précision minimale des anomalies signalées
+REPEAT = 3  # répétitions de chaque mesure de temps
+CACHE_PATH = os.path.join(OUTPUT_DIR, "features_cache.npz")
+
+# Empreinte des fichiers de logs : le cache est invalidé si l'un d'eux change
+def logs_fingerprint(logs_dir=LOGS_DIR):
+    digest = hashlib.sha1()
+    for filename in sorted(os.listdir(logs_dir)):
+        if filename.endswith('.json'):
+            stat = os.stat(os.path.join(logs_dir, filename))
+            digest.update(f"{filename}|{stat.st_size}|{stat.st_mtime_ns}".encode('utf-8'))
+    return digest.hexdigest()
+
+# Calculer la matrice de caractéristiques une seule fois et la mettre en cache
+def load_feature_matrix(logs_dir=LOGS_DIR, cache_path=CACHE_PATH):
+    fingerprint = logs_fingerprint(logs_dir)
+    if os.path.exists(cache_path):
+        with np.load(cache_path) as cache:
+            valid = str(cache['fingerprint']) == fingerprint and list(cache['features']) == FEATURES
+        if valid:
+            print(f"Matrice de caractéristiques chargée depuis {cache_path}")
+            return cache_path
+
+    df = build_features(load_logs(logs_dir))
+    labels = extract_labels(df)
+    if labels is None:
+        raise ValueError("Les logs ne contiennent pas d'étiquettes de vérité terrain. Relancer dataTrain.py.")
+
+    np.savez(cache_path, X=df[FEATURES].to_numpy(dtype=np.float64), y=labels,
+             features=np.array(FEATURES), fingerprint=np.array(fingerprint))
+    print(f"Matrice de caractéristiques calculée et enregistrée dans {cache_path}")
+    return cache_path
+
+# Chaque processus charge la matrice une seule fois, au démarrage
+_worker_data = {}
+
+def _init_worker(cache_path):
+    with np.load(cache_path) as cache:
+        _worker_data['X'] = cache['X']
+        _worker_data['y'] = cache['y']
+        _worker_data['features'] = list(cache['features'])
+
+# Nombre d'échantillons réellement tirés par arbre (IsolationForest plafonne à n_samples)
+def effective_max_samples(max_samples, n_samples):
+    if max_samples == 'auto':
+        return min(256, n_samples)
+    return min(max_samples, n_samples)
+
+# Grille sans doublons : deux valeurs de max_samples qui donnent le même nombre
+# d'échantillons par arbre correspondent à la même configuration
+def build_grid(n_samples):
+    grid, seen = [], set()
+    for contamination, n_estimators, max_samples, subset in itertools.product(
+            CONTAMINATIONS, N_ESTIMATORS, MAX_SAMPLES, FEATURE_SUBSETS):
+        key = (contamination, n_estimators, effective_max_samples(max_samples, n_samples), subset)
+        if key not in seen:
+            seen.add(key)
+            grid.append((contamination, n_estimators, max_samples, subset))
+    return grid
+
+# Évaluer une configuration de la grille ; les temps mesurés sont le minimum sur `repeat`
+# exécutions, les processus se partageant le processeur
+def evaluate(config, repeat=REPEAT):
+    contamination, n_estimators, max_samples, subset = config
+    columns = [_worker_data['features'].index(feature) for feature in FEATURE_SUBSETS[subset]]
+    X = StandardScaler().fit_transform(_worker_data['X'][:, columns])
+
+    fit_times, score_times = [], []
+    for _ in range(repeat):
+        model = IsolationForest(
+            n_estimators=n_estimators,
+            max_samples=max_samples,
+            contamination=contamination,
+            random_state=42,
+            n_jobs=1
+        )
+        start = time.perf_counter()
+        model.fit(X)
+        fit_times.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        flagged = model.predict(X) == -1
+        score_times.append(time.perf_counter() - start)
+
+    effective = effective_max_samples(max_samples, X.shape[0])
+    return {
+        'contamination': contamination,
+        'n_estimators': n_estimators,
+        'max_samples': max_samples,
+        'effective_max_samples': effective,
+        'features': subset,
+        # Coût déterministe du scoring, par événement : chaque arbre est parcouru
+        # sur une profondeur moyenne de l'ordre de log2(max_samples)
+        'cost': n_estimators * np.log2(effective),
+        'fit_time_s': min(fit_times),
+        'score_time_s': min(score_times),
+        **label_quality(flagged, _worker_data['y']),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Balayage des hyperparamètres d'IsolationForest")
+    parser.add_argument('--workers', type=int, default=None, help="Nombre de processus (tous les cœurs par défaut)")
+    parser.add_argument('--target-recall', type=float, default=TARGET_RECALL)
+    parser.add_argument('--min-precision', type=float, default=MIN_PRECISION)
+    parser.add_argument('--repeat', type=int, default=REPEAT, help="Répétitions de chaque mesure de temps")
+    args = parser.parse_args()
+
+    if not os.path.exists(OUTPUT_DIR):
+        os.makedirs(OUTPUT_DIR)
+
+    cache_path = load_feature_matrix()
+    with np.load(cache_path) as cache:
+        n_samples = cache['X'].shape[0]
+    grid = build_grid(n_samples)
+    print(f"Évaluation de {len(grid)} configurations...")
+
+    with ProcessPoolExecutor(max_workers=args.workers, initializer=_init_worker, initargs=(cache_path,)) as executor:
+        results = pd.DataFrame(executor.map(partial(evaluate, repeat=args.repeat), grid, chunksize=4))
+
+    results['total_time_s'] = results['fit_time_s'] + results['score_time_s']
+    results = results.sort_values(['f1', 'cost'], ascending=[False, True])
+    results.to_csv(os.path.join(OUTPUT_DIR, "sweep_results.csv"), index=False)
+    print(results.head(10).to_string(index=False, float_format=lambda x: f"{x:.4f}"))
+
+    # Configuration la moins coûteuse à scorer qui atteint le rappel et la précision visés,
+    # départagée par le F1 puis par le temps mesuré
+    candidates = results[(results['recall'] >= args.target_recall) & (results['precision'] >= args.min_precision)]
+    thresholds = f"rappel >= {args.target_recall:.2f} et précision >= {args.min_precision:.2f}"
+    if candidates.empty:
+        print(f"Aucune configuration n'atteint {thresholds}.")
+    else:
+        best = candidates.sort_values(['cost', 'f1', 'total_time_s'], ascending=[True, False, True]).iloc[0]
+        print(f"\nConfiguration la moins coûteuse avec {thresholds}:")
+        print(best.to_string())
@@ -0,0 +1,44 @@
+import sqlite3
+
+import pandas as pd
+import pytest
+
+from alert_store import AlertStore
+
+
+def alerts():
+    return pd.DataFrame({
+        'user': ['a@x.com', 'b@x.com', 'a@x.com'],
+        'timestamp': pd.to_datetime(['2025-01-01T03:00:00Z', '2025-01-02T04:00:00Z', '2025-01-03T23:00:00Z']),
+        'action': ['login', 'reset_password', 'download_all_files'],
+        'location.countryOrRegion': ['RU', 'CN', 'FR'],
+        'deviceType': ['PC', 'MOBILE', 'PC'],
+        'ipAddress': ['1.1.1.1', '2.2.2.2', '3.3.3.3'],
+        'is_night': [1, 1, 1],
+        'anomaly_probability': [0.95, 0.85, 0.9],
+        'anomaly_level': ['Très élevé', 'Très élevé', 'Très élevé'],
+    })
+
+
+def test_upsert_is_idempotent_and_queries_are_ordered(tmp_path):
+    path = tmp_path / "alerts.db"
+    with AlertStore(path) as store:
+        store.upsert_alerts(alerts())
+        store.upsert_alerts(alerts())
+
+        assert store.count_alerts() == 3
+        assert store.query_alerts()['anomaly_probability'].tolist() == [0.95, 0.9, 0.85]
+        assert store.query_alerts(order_by='timestamp', limit=1)['action'].tolist() == ['download_all_files']
+        assert store.count_alerts(user='a@x.com', start='2025-01-02', end='2025-01-04') == 1
+
+
+def test_prune_and_read_only(tmp_path):
+    path = tmp_path / "alerts.db"
+    with AlertStore(path) as store:
+        store.upsert_alerts(alerts())
+        assert store.prune(1, reference=pd.Timestamp('2025-01-02T12:00:00Z')) == 1
+
+    with AlertStore(path, read_only=True) as store:
+        assert store.count_alerts() == 2
+        with pytest.raises(sqlite3.OperationalError):
+            store.conn.execute("DELETE FROM alerts")
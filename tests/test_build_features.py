@@ -0,0 +1,48 @@
+from InstaTrace import FEATURES, LABEL_COLUMN, build_features, extract_labels
+
+NATIVE_LOGS = [
+    {
+        "id": "10001",
+        "user": "neila.mansouri@outlook.com",
+        "timestamp": "2025-01-10T14:00:00.000000Z",
+        "ipAddress": "10.0.0.1",
+        "action": "login",
+        "appDisplayName": "Outlook",
+        "deviceType": "PC",
+        "location": {"countryOrRegion": "FR"},
+        LABEL_COLUMN: 0,
+    },
+    {
+        "id": "10002",
+        "user": "neila.mansouri@outlook.com",
+        "timestamp": "2025-02-03T03:12:45.000000Z",
+        "ipAddress": "10.0.0.2",
+        "action": "download_all_files",
+        "appDisplayName": "Chrome",
+        "deviceType": "MOBILE",
+        "location": {"countryOrRegion": "RU"},
+        LABEL_COLUMN: 1,
+    },
+]
+
+MICROSOFT_LOGS = [
+    {"id": "ms-1", "activity": "Update user", "time": "2025-01-10T14:00:00Z", "targetUser": "admin@contoso.com"},
+    {"id": "ms-2", "activity": "Reset password", "time": "2025-01-11 23:30:00", "targetUser": "admin@contoso.com"},
+]
+
+
+def test_mixed_formats_keep_labels_and_timestamps():
+    # Le journal Microsoft en tête ne doit pas imposer son format aux autres horodatages
+    df = build_features(MICROSOFT_LOGS + NATIVE_LOGS)
+
+    assert extract_labels(df).tolist() == [0, 0, 0, 1]
+    assert df['timestamp'].dt.hour.tolist() == [14, 23, 14, 3]
+    assert df['is_night'].tolist() == [0, 1, 0, 1]
+    assert not df[FEATURES].isna().any().any()
+
+
+def test_logs_without_labels():
+    df = build_features(MICROSOFT_LOGS)
+
+    assert extract_labels(df) is None
+    assert len(df) == 2
@@ -0,0 +1,48 @@
+import numpy as np
+import pytest
+
+from detectors import DETECTORS, HBOSDetector, get_detector
+
+
+def flagged_count(scores, contamination=0.05):
+    # Seuil calculé sur des scores donnés, signalement comme dans predict
+    detector = HBOSDetector(contamination=contamination)
+    return int(np.sum(np.asarray(scores) < detector._threshold(np.asarray(scores))))
+
+
+def test_threshold_without_ties():
+    # 100 scores distincts : 5 % signalés exactement
+    assert flagged_count(np.arange(100.0)) == 5
+
+
+def test_threshold_small_tie_group_is_flagged():
+    # 3 scores distincts puis 4 ex æquo autour du 5e : le groupe (7 <= 2 x 5) est signalé
+    scores = np.concatenate([[0.0, 1.0, 2.0], np.full(4, 3.0), np.arange(10.0, 103.0)])
+    assert flagged_count(scores) == 7
+
+
+def test_threshold_large_tie_group_is_excluded():
+    # 2 scores sous un groupe de 20 ex æquo (> 2 x 5) : seuls les 2 premiers sont signalés
+    scores = np.concatenate([[0.0, 1.0], np.full(20, 2.0), np.arange(10.0, 88.0)])
+    assert flagged_count(scores) == 2
+
+
+def test_threshold_all_scores_tied():
+    assert flagged_count(np.zeros(100)) == 0
+
+
+@pytest.mark.parametrize("name", [name for name in DETECTORS if name != "isolation_forest"])
+def test_constant_features_flag_nothing(name):
+    X = np.ones((100, 4))
+    model = get_detector(name, contamination=0.05, random_state=42)
+    assert np.sum(model.fit_predict(X) == -1) == 0
+
+
+@pytest.mark.parametrize("name", list(DETECTORS))
+def test_outliers_are_flagged(name):
+    rng = np.random.default_rng(0)
+    X = np.vstack([rng.normal(0, 1, size=(190, 3)), rng.normal(8, 0.5, size=(10, 3))])
+    model = get_detector(name, contamination=0.05, random_state=42)
+    flagged = model.fit_predict(X) == -1
+    assert flagged[190:].sum() >= 8
+    assert flagged.sum() <= 2 * 10
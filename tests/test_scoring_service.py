@@ -0,0 +1,119 @@
+import asyncio
+import json
+import random
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+
+from InstaTrace import build_features, train_model
+from scoring_service import ScoringService
+
+USERS = {
+    "neila.mansouri@outlook.com": ["FR", "GB"],
+    "rania.bordjiba@outlook.com": ["FR", "DZ"],
+}
+
+
+def native_events(n, seed):
+    rng = random.Random(seed)
+    start = datetime(2024, 12, 1)
+    events = []
+    for i in range(n):
+        user = rng.choice(list(USERS))
+        timestamp = start + timedelta(days=rng.randint(0, 60), hours=rng.randint(8, 20), minutes=rng.randint(0, 59))
+        events.append({
+            "id": f"{seed}-{i}",
+            "user": user,
+            "timestamp": timestamp.strftime("%Y-%m-%dT%H:%M:%S.%fZ"),
+            "ipAddress": f"10.0.{seed}.{i % 250}",
+            "action": rng.choice(["login", "view_file", "send_email"]),
+            "appDisplayName": "Outlook",
+            "deviceType": rng.choice(["PC", "MOBILE"]),
+            "location": {"countryOrRegion": rng.choice(USERS[user])},
+            "is_anomaly": 0,
+        })
+    return events
+
+
+# Journaux d'audit Microsoft, avec et sans fuseau horaire
+MICROSOFT_LOGS = [
+    {"id": "ms-1", "activity": "Update user", "time": "2025-01-10T14:00:00Z",
+     "targetUser": "neila.mansouri@outlook.com",
+     "initiatedBy": {"user": "admin@contoso.com", "role": "Global Administrator"}},
+    {"id": "ms-2", "activity": "Reset password", "time": "2025-01-11T03:12:45.123Z",
+     "targetUser": "rania.bordjiba@outlook.com"},
+    {"id": "ms-3", "activity": "Modify permissions", "time": "2025-01-12 23:30:00",
+     "targetUser": "nouvel.utilisateur@contoso.com"},
+]
+
+
+@pytest.fixture(scope="module")
+def artifact():
+    return train_model(build_features(native_events(200, seed=0)))
+
+
+async def send(port, raw):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    writer.write(raw)
+    await writer.drain()
+    response = await reader.read()
+    writer.close()
+    head, _, payload = response.partition(b"\r\n\r\n")
+    return int(head.split(b" ")[1]), json.loads(payload)
+
+
+def post(port, payload):
+    body = json.dumps(payload).encode("utf-8")
+    return send(port, (
+        f"POST /score HTTP/1.1\r\nHost: localhost\r\nContent-Type: application/json\r\n"
+        f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n"
+    ).encode("latin-1") + body)
+
+
+async def run_with_server(artifact, scenario):
+    service = ScoringService(artifact, max_delay_ms=50)
+    await service.start()
+    server = await asyncio.start_server(service.handle_connection, "127.0.0.1", 0)
+    try:
+        return await scenario(server.sockets[0].getsockname()[1]), service.metrics.snapshot()
+    finally:
+        server.close()
+        await server.wait_closed()
+        await service.stop()
+
+
+def test_batched_scores_match_unbatched(artifact):
+    # Chaque requête mélange les deux formats, le journal Microsoft en tête
+    payloads = [[MICROSOFT_LOGS[i % 3]] + native_events(10, seed=i + 1) for i in range(6)]
+
+    async def scenario(port):
+        alone = [await post(port, payload) for payload in payloads]
+        # Requêtes concurrentes regroupées en micro-lots, avec une requête invalide au milieu
+        batched = await asyncio.gather(*(post(port, p) for p in payloads[:3] + [[1, 2]] + payloads[3:]))
+        return alone, batched
+
+    (alone, batched), metrics = asyncio.run(run_with_server(artifact, scenario))
+    invalid = batched.pop(3)
+
+    assert invalid[0] == 400
+    assert metrics['batches_total'] < len(alone) + len(batched)
+    for (status_alone, a), (status_batched, b) in zip(alone, batched):
+        assert status_alone == status_batched == 200
+        assert a['count'] == b['count'] == 11
+        for event_alone, event_batched in zip(a['results'], b['results']):
+            assert np.isclose(event_alone['anomaly_score'], event_batched['anomaly_score'])
+            assert event_alone['reasons'] == event_batched['reasons']
+            assert event_alone['timestamp'] == event_batched['timestamp']
+
+
+@pytest.mark.parametrize("raw", [
+    b"GARBAGE\r\n\r\n",
+    b"POST /score HTTP/1.1\r\nContent-Length: abc\r\n\r\n",
+])
+def test_malformed_requests_get_400(artifact, raw):
+    (status, response), metrics = asyncio.run(run_with_server(artifact, lambda port: send(port, raw)))
+
+    assert status == 400
+    assert 'error' in response
+    assert metrics['errors_total'] == 1